@@ -6,14 +6,20 @@ NL and EN versions should work fine.
 Some of the column names are used later, e.g. date, amount, name, so they are
 assigned to a constant. Column names are also used for transaction presets.
 If you need to parse other bank statements, make sure these columns exist.
+
+Columns which are not in REQUIRED_COLUMNS can be skipped while parsing.
 """
 
+import contextlib
 import re
 from abc import ABC, abstractmethod
+from collections.abc import Iterable
 from datetime import datetime
 from pathlib import Path
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 COLUMNS = [
     "date",
@@ -27,6 +33,18 @@ COLUMNS = [
     "notifications",
 ]
 
+# Columns used by the reports and transfers, always parsed
+REQUIRED_COLUMNS = ["date", "name", "debit/credit", "amount"]
+
+# Statements above this size (bytes) are read in chunks of CHUNK_ROWS rows
+LARGE_STATEMENT_SIZE = 64 * 1024 * 1024
+CHUNK_ROWS = 200_000
+
+# The target fname looks as: (IBAN)_(datefrom)_(dateto).csv
+ING_FNAME_PATTERN = re.compile(
+    r"(.+)_(\d{2}-\d{2}-\d{4})_(\d{2}-\d{2}-\d{4})\.csv"
+)
+
 
 class BankStatementParser(ABC):
     """Abstract base class for parsing bank statements.
@@ -45,6 +63,13 @@ class BankStatementParser(ABC):
         Start and end dates of the bank statement
     """
 
+    __slots__ = (
+        "transactions",
+        "date_range",
+        "_recent_bank_statement",
+        "_bank_statement_folder",
+    )
+
     def __init__(self, statement_folder: str = "./bank_statements/") -> None:
         self.transactions: pd.DataFrame = pd.DataFrame()
         self.date_range: tuple[datetime, datetime]
@@ -69,6 +94,9 @@ class IngParser(BankStatementParser):
     ----------
     statement_folder : str, optional
         Path to the folder with bank statements, './bank_statements/' by default
+    usecols : Iterable[str], optional
+        Columns to parse, by default None for all COLUMNS. REQUIRED_COLUMNS
+        are always included.
 
     Attributes
     ----------
@@ -80,26 +108,126 @@ class IngParser(BankStatementParser):
 
     """
 
+    __slots__ = ("_usecols",)
+
+    def __init__(
+        self,
+        statement_folder: str = "./bank_statements/",
+        usecols: Iterable[str] | None = None,
+    ) -> None:
+        selected = set(COLUMNS if usecols is None else usecols)
+        selected.update(REQUIRED_COLUMNS)
+        # Keep the file order, the csv columns are selected by position
+        self._usecols = [column for column in COLUMNS if column in selected]
+        super().__init__(statement_folder)
+
     def _parse_statement(self) -> pd.DataFrame:
         """
         Parse and format statement .csv file to a DataFrame.
+
+        The parsed table is cached next to the statement as a .parquet file,
+        so the csv is only parsed again when the statement file changes.
         """
-        df = pd.read_csv(self._recent_bank_statement, header=0, names=COLUMNS)
-        df["date"] = pd.to_datetime(df["date"], format="%Y%m%d")
-        df["amount"] = df["amount"].str.replace(",", ".").astype("float64")
+        cache_file = self._get_cache_file()
+        if self._is_cache_valid(cache_file):
+            df = pd.read_parquet(cache_file, columns=self._usecols)
+
+            # Parquet restores text as StringDtype and categories as object,
+            # cast them back to the arrow strings of the csv reader
+            arrow_string = pd.ArrowDtype(pa.string())
+            dtypes = {
+                column: arrow_string
+                for column in df.select_dtypes("string").columns
+            }
+            categories = df["debit/credit"].cat.categories.astype(arrow_string)
+            dtypes["debit/credit"] = pd.CategoricalDtype(categories)
+
+            self.transactions = df.astype(dtypes)
+            return self.transactions
+
+        # ING uses a decimal comma, let the csv reader convert it directly.
+        # The pyarrow engine ignores names with header=0, so skip the header.
+        read_options = {
+            "dtype_backend": "pyarrow",
+            "skiprows": 1,
+            "header": None,
+            "names": self._usecols,
+            "usecols": [COLUMNS.index(column) for column in self._usecols],
+            "decimal": ",",
+            "dtype": {"amount": "float64"},
+            "parse_dates": ["date"],
+            "date_format": "%Y%m%d",
+        }
+
+        statement = self._recent_bank_statement
+        if statement.stat().st_size > LARGE_STATEMENT_SIZE:
+            # Limits peak memory, pyarrow engine can't read in chunks
+            chunks = pd.read_csv(
+                statement, chunksize=CHUNK_ROWS, **read_options
+            )
+            df = pd.concat(chunks, ignore_index=True)
+        else:
+            df = pd.read_csv(statement, engine="pyarrow", **read_options)
+
+        # Only "Debit" or "Credit"
+        df["debit/credit"] = df["debit/credit"].astype("category")
         self.transactions = df
+        self._save_cache(df, cache_file)
 
         return df
 
-    def _find_closest_end_date_file(
-        self, file_match: list[re.Match | None]
-    ) -> str:
+    def _get_cache_file(self) -> Path:
+        """Returns the parquet cache path, tagged with the statement
+        modification time, e.g. (IBAN)_(datefrom)_(dateto).(mtime).parquet
+        """
+        mtime_ns = self._recent_bank_statement.stat().st_mtime_ns
+        return self._recent_bank_statement.with_suffix(f".{mtime_ns}.parquet")
+
+    def _is_cache_valid(self, cache_file: Path) -> bool:
+        """Checks that the cache exists and has all the requested columns"""
+        if not cache_file.exists():
+            return False
+
+        try:
+            cached_columns = pq.read_schema(cache_file).names
+        except (OSError, pa.ArrowException):
+            # Unreadable or broken cache, the csv is parsed again
+            return False
+
+        return set(self._usecols).issubset(cached_columns)
+
+    def _save_cache(self, df: pd.DataFrame, cache_file: Path) -> None:
+        """Saves parsed transactions and removes caches of older versions of
+        the same statement.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Parsed bank statement
+        cache_file : Path
+            Target parquet file
+        """
+        statement = self._recent_bank_statement
+        try:
+            for stale_file in statement.parent.glob(
+                f"{statement.stem}.*.parquet"
+            ):
+                stale_file.unlink()
+
+            df.to_parquet(cache_file, compression="zstd")
+        except OSError as e:
+            # The cache is optional, e.g. the folder can be read-only
+            print(f"(!)Bank statement cache is not saved: {e}\n")
+            with contextlib.suppress(OSError):
+                cache_file.unlink(missing_ok=True)
+
+    def _find_closest_end_date_file(self, file_match: list[re.Match]) -> str:
         """Parses the dates from the file names and returns the file with the
         latest range.
 
         Parameters
         ----------
-        file_match : list[re.Match  |  None]
+        file_match : list[re.Match]
             List of files, which matched ING fname structure
 
         Returns
@@ -107,26 +235,25 @@ class IngParser(BankStatementParser):
         str
             Latest statement .csv file
         """
-        today = datetime.today()
-        recent_file = None
-        closest_days_diff = float("inf")
+        recent_match = None
+        latest_end_key = ""
 
         for match in file_match:
-            if match is None:
-                continue
-
-            _, start_date, end_date = match.groups()
-            end_date = datetime.strptime(end_date, "%d-%m-%Y")
-            start_date = datetime.strptime(start_date, "%d-%m-%Y")
-
-            days_diff = (today - end_date).days
-
-            if days_diff < closest_days_diff:
-                closest_days_diff = days_diff
-                recent_file = match.string
-                self.date_range = (start_date, end_date)
-        if isinstance(recent_file, str):
-            return recent_file
+            end_date = match.group(3)
+            # dd-mm-yyyy -> yyyymmdd, which compares in chronological order
+            end_key = end_date[6:] + end_date[3:5] + end_date[:2]
+
+            if end_key > latest_end_key:
+                latest_end_key = end_key
+                recent_match = match
+
+        if recent_match is not None:
+            _, start_date, end_date = recent_match.groups()
+            self.date_range = (
+                datetime.strptime(start_date, "%d-%m-%Y"),
+                datetime.strptime(end_date, "%d-%m-%Y"),
+            )
+            return recent_match.string
 
         raise FileNotFoundError("ING bank statement is not found")
 
@@ -139,16 +266,17 @@ class IngParser(BankStatementParser):
             Returns False if file is not found and True if it was assigned
         """
         root_path = Path(self._bank_statement_folder)
-        csv_files = list(root_path.glob("*.csv"))
-
-        # The target fname looks as: (IBAN)_(datefrom)_(dateto).csv
-        file_pattern = r"(.+)_(\d{2}-\d{2}-\d{4})_(\d{2}-\d{2}-\d{4})"
+        csv_files = root_path.glob("*.csv")
 
         file_matches = [
-            re.match(file_pattern, file.name) for file in csv_files
+            match
+            for match in map(
+                ING_FNAME_PATTERN.fullmatch, (file.name for file in csv_files)
+            )
+            if match
         ]
 
-        if not any(file_matches):
+        if not file_matches:
             print("(!)No files matched for the bank statement parser.\n")
             return False
 
@@ -7,20 +7,45 @@ foe 5-7 days before expiration.
 Wallet categories are cached for quicker access.
 """
 
+import functools
 import getpass
 import os
-from datetime import datetime, timedelta
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
 
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson is optional, json.loads also accepts bytes
+    from json import loads as json_loads
+
+CATEGORY_TYPES = {0: "debt/loan", 1: "income", 2: "expense"}
+SECONDS_IN_DAY = 24 * 60 * 60
+
+
+def _to_iso_date(date: datetime) -> str:
+    """Formats a date as "yyyy-mm-dd" without the locale aware strftime"""
+    return f"{date.year:04d}-{date.month:02d}-{date.day:02d}"
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_date(date: str) -> datetime:
+    """Parses a "dd.mm.yyyy" date string. Cached, as the same dates are
+    usually typed in repeatedly."""
+    return datetime.strptime(date, "%d.%m.%Y")
 
 
 class MoneyLoverClient:
     """MoneyLover api client. Log in using MoneyLover account credentials.
 
-    On instance creation it logs in, saves the
-    access token, retrieves existing wallets and expense categories.
+    Nothing is requested on instance creation. The client logs in (or loads
+    a saved access token) on the first API call, wallets and expense
+    categories are loaded on first access.
 
     Parameters
     ----------
@@ -31,6 +56,9 @@ class MoneyLoverClient:
 
     Attributes
     ----------
+    access_token : str
+        Token for the API requests, loaded or received on first access
+
     wallets : DataFrame
         Table with wallets
 
@@ -61,16 +89,30 @@ class MoneyLoverClient:
     api_url = "https://web.moneylover.me/api"
     script_dir = Path(__file__).resolve().parent
     access_token_file = script_dir / "resources/access_token.txt"
-    categories_file = script_dir / "resources/categories.csv"
+    categories_file = script_dir / "resources/categories.parquet"
 
     def __init__(self, email: str | None = None, password: str | None = None):
-        self.wallets: pd.DataFrame
-        self.categories: pd.DataFrame
+        self._email = email
+        self._password = password
+        self._transactions_cache: dict[tuple[str, str, str], dict] = {}
+        self._categories_by_wallet: dict[str, pd.DataFrame] | None = None
+        self._ensure_resources_dir()
+
+        # Reuse connections between the API calls
+        self._session = requests.Session()
+        self._session.mount(
+            "https://", HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        )
 
+    @functools.cached_property
+    def access_token(self) -> str:
+        """Access token from the file, logs in if it is missing or expired"""
         access_token = self._load_access_token()
 
         if access_token is None:
             print("MoneyLover login required")
+            email = self._email
+            password = self._password
             if email is None:
                 email = input("E-mail: ")
             if password is None:
@@ -79,43 +121,56 @@ class MoneyLoverClient:
             access_token = self._get_token(email, password)
             self._save_access_token(access_token)
 
-        self._jwt_token = access_token
+        return access_token
 
-        self.get_wallets_summary()
-        self.load_categories()
+    @functools.cached_property
+    def wallets(self) -> pd.DataFrame:
+        """Table with wallets, requested on first access"""
+        return self.get_wallets_summary()
+
+    @classmethod
+    @functools.cache
+    def _ensure_resources_dir(cls) -> None:
+        """Creates folders for the token and categories files. Cached, so the
+        file system is only checked once per class."""
+        for file in (cls.access_token_file, cls.categories_file):
+            file.parent.mkdir(parents=True, exist_ok=True)
 
     def _load_access_token(self):
         """Try to load the access token from the file"""
         try:
-            if self._is_token_valid():
-                with open(
-                    self.access_token_file, "r", encoding="utf_8"
-                ) as file:
-                    return file.read().strip()
-            else:
-                return None
+            with open(self.access_token_file, "r", encoding="utf_8") as file:
+                modified_time = os.fstat(file.fileno()).st_mtime
+                if not self._is_token_valid(modified_time=modified_time):
+                    return None
+                return file.read().strip()
 
         except FileNotFoundError:
             return None
 
-    def _is_token_valid(self, days=5) -> bool:
+    def _is_token_valid(
+        self, days=5, modified_time: float | None = None
+    ) -> bool:
         """Check if the saved token has expired or not.
 
         Parameters
         ----------
         days : int, optional
             Expiration target in days, by default 5
+        modified_time : float, optional
+            Token file modification timestamp, if it is already known.
+            By default None, the file is checked.
 
         Returns
         -------
         bool
             True if the file is older than days passed in the argument.
         """
-        file_modified_time = os.path.getmtime(self.access_token_file)
-        file_modified_datetime = datetime.fromtimestamp(file_modified_time)
-        time_passed = datetime.now() - file_modified_datetime
+        if modified_time is None:
+            modified_time = os.path.getmtime(self.access_token_file)
+        seconds_passed = time.time() - modified_time
 
-        return time_passed < timedelta(days=days)
+        return seconds_passed < days * SECONDS_IN_DAY
 
     def _save_access_token(self, token):
         """Save the token to the file"""
@@ -138,10 +193,10 @@ class MoneyLoverClient:
         str
             Access token used for authentification
         """
-        login_url_response = requests.post(
+        login_url_response = self._session.post(
             "https://web.moneylover.me/api/user/login-url", timeout=5
         )
-        login_url_data = login_url_response.json()
+        login_url_data = json_loads(login_url_response.content)
 
         request_token = login_url_data["data"]["request_token"]
         client_id = (
@@ -161,10 +216,10 @@ class MoneyLoverClient:
         }
         data = {"email": email, "password": password}
 
-        token_response = requests.post(
+        token_response = self._session.post(
             token_url, headers=headers, data=data, timeout=5
         )
-        token_data = token_response.json()
+        token_data = json_loads(token_response.content)
 
         access_token = token_data["access_token"]
 
@@ -198,17 +253,17 @@ class MoneyLoverClient:
             Moneylover API response as json dict or list of dicts
         """
         url = self.api_url + path
-        headers = {
-            "authorization": f"AuthJWT {self._jwt_token}",
-            **(headers or {}),
-        }
+        # The first request logs in if there is no valid saved token
+        request_headers = {"authorization": f"AuthJWT {self.access_token}"}
+        if headers is not None:
+            request_headers.update(headers)
 
-        response = requests.post(
-            url, headers=headers, data=data, json=body, timeout=120
+        response = self._session.post(
+            url, headers=request_headers, data=data, json=body, timeout=120
         )
         response.raise_for_status()
 
-        response_data = response.json()
+        response_data = json_loads(response.content)
 
         if "error" in response_data and response_data["error"] != 0:
             error_msg = (
@@ -255,22 +310,34 @@ class MoneyLoverClient:
             Dataframe with wallets info. Cols:  _id, name, balance, currency
         """
         wallets = self.get_wallets()
-        wallet_names = []
+        ids, names, balances, currencies = [], [], [], []
 
         for wallet in wallets:
-            wallet_data = {
-                "_id": wallet["_id"],
-                "name": wallet["name"],
-                "balance": list(wallet["balance"][0].values())[0],
-                "currency": list(wallet["balance"][0].keys())[0],
+            # balance is stored as [{currency: amount}]
+            currency, balance = next(iter(wallet["balance"][0].items()))
+
+            ids.append(wallet["_id"])
+            names.append(wallet["name"])
+            balances.append(balance)
+            currencies.append(currency)
+
+        self.wallets = pd.DataFrame(
+            {
+                "_id": ids,
+                "name": names,
+                "balance": balances,
+                "currency": currencies,
             }
-
-            wallet_names.append(wallet_data)
-        self.wallets = pd.DataFrame(wallet_names)
+        )
 
         return self.wallets
 
-    def load_categories(self, reload: bool = False) -> None:
+    @functools.cached_property
+    def categories(self) -> pd.DataFrame:
+        """Table with categories for every wallet, loaded on first access"""
+        return self.load_categories()
+
+    def load_categories(self, reload: bool = False) -> pd.DataFrame:
         """There are a lot of categories and it takes time to load them.
         So this method retrives them once and saves them to a file.
 
@@ -278,29 +345,90 @@ class MoneyLoverClient:
         ----------
         reload : bool, optional
             Pass a True to forcefully update the categories, by default False
+
+        Returns
+        -------
+        pd.DataFrame
+            Categories for every wallet
         """
-        types = {0: "debt/loan", 1: "income", 2: "expense"}
+        self._categories_by_wallet = None
 
         if self.categories_file.exists() and not reload:
-            self.categories = pd.read_csv(self.categories_file)
+            self.categories = pd.read_parquet(self.categories_file)
         else:
-            all_categories = pd.DataFrame()
-            for _, wallet in self.wallets.iterrows():
-                wallet_categories = pd.DataFrame(
-                    self._get_wallet_categories(wallet["_id"])
+            wallet_ids = self.wallets["_id"]
+            wallet_names = self.wallets["name"]
+
+            # Requests are independent, so fetch every wallet at once
+            max_workers = min(8, len(wallet_ids)) or 1
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                responses = executor.map(
+                    self._get_wallet_categories, wallet_ids
                 )
-                wallet_categories["wallet_id"] = wallet["_id"]
-                wallet_categories["wallet_name"] = wallet["name"]
+                wallet_categories = [
+                    pd.DataFrame(categories).assign(
+                        wallet_id=wallet_id, wallet_name=wallet_name
+                    )
+                    for categories, wallet_id, wallet_name in zip(
+                        responses, wallet_ids, wallet_names
+                    )
+                ]
+
+            columns = [
+                "wallet_id", "wallet_name", "type", "name", "_id", "parent"
+            ]
 
-                # replace numeric type with a string
-                wallet_categories.replace({"type": types}, inplace=True)
+            # Concatenate once, pd.concat fails on an empty list
+            if wallet_categories:
+                all_categories = pd.concat(
+                    wallet_categories, ignore_index=True
+                )
+            else:
+                all_categories = pd.DataFrame()
+            all_categories = all_categories.reindex(columns=columns)
+
+            # replace numeric type with a string
+            all_categories["type"] = all_categories["type"].map(CATEGORY_TYPES)
+
+            # Few distinct values, repeated for every category
+            self.categories = all_categories.astype(
+                {
+                    "wallet_id": "category",
+                    "wallet_name": "category",
+                    "type": "category",
+                }
+            )
+            self.categories.to_parquet(
+                self.categories_file, compression="zstd", index=False
+            )
 
-                all_categories = pd.concat([all_categories, wallet_categories])
+        return self.categories
 
-            self.categories = all_categories[
-                ["wallet_id", "wallet_name", "type", "name", "_id", "parent"]
-            ]
-            self.categories.to_csv(self.categories_file)
+    def categories_for_wallet(self, wallet_id: str) -> pd.DataFrame:
+        """Returns categories of a single wallet.
+
+        Categories are grouped by wallet once, so switching between wallets
+        doesn't scan the whole table.
+
+        Parameters
+        ----------
+        wallet_id : str
+            Wallet unique _id
+
+        Returns
+        -------
+        pd.DataFrame
+            Categories of the wallet, empty if the wallet has none
+        """
+        if self._categories_by_wallet is None:
+            grouped = self.categories.groupby(
+                "wallet_id", observed=True, sort=False
+            )
+            self._categories_by_wallet = dict(tuple(grouped))
+
+        return self._categories_by_wallet.get(
+            wallet_id, self.categories.iloc[:0]
+        )
 
     def _get_wallet_categories(self, wallet_id: str) -> list[dict]:
         """Retrieves wallet expense and income categories.
@@ -345,22 +473,31 @@ class MoneyLoverClient:
         Returns
         -------
         dict
-            Transactions in the wallet for the requested range
+            Transactions in the wallet for the requested range. Responses
+            are cached until a new transaction is added.
         """
         if isinstance(start_date, str):
-            start_date = datetime.strptime(start_date, "%d.%m.%Y")
+            start_date = _parse_date(start_date)
         if isinstance(end_date, str):
-            end_date = datetime.strptime(end_date, "%d.%m.%Y")
+            end_date = _parse_date(end_date)
+
+        start_iso = _to_iso_date(start_date)
+        end_iso = _to_iso_date(end_date)
+        cache_key = (wallet_id, start_iso, end_iso)
+
+        if cache_key in self._transactions_cache:
+            return self._transactions_cache[cache_key]
 
         transactions = self._post_request(
             path="/transaction/list",
             body={
-                "startDate": start_date.strftime("%Y-%m-%d"),
-                "endDate": end_date.strftime("%Y-%m-%d"),
+                "startDate": start_iso,
+                "endDate": end_iso,
                 "walletId": wallet_id,
             },
         )
         if isinstance(transactions, dict):
+            self._transactions_cache[cache_key] = transactions
             return transactions
 
         raise ReturnedTypeError()
@@ -394,7 +531,7 @@ class MoneyLoverClient:
             Sends a post request. Returns a transaction data.
         """
         if isinstance(date, str):
-            date = datetime.strptime(date, "%d.%m.%Y")
+            date = _parse_date(date)
 
         transaction_data = {
             "with": [],  # You can customize this if needed
@@ -402,7 +539,7 @@ class MoneyLoverClient:
             "category": category_id,
             "amount": amount,
             "note": note,
-            "displayDate": date.strftime("%Y-%m-%d"),
+            "displayDate": _to_iso_date(date),
         }
 
         response = self._post_request(
@@ -410,6 +547,9 @@ class MoneyLoverClient:
             headers={"Content-Type": "application/json"},
             body=transaction_data,
         )
+        # Cached transaction lists are outdated now
+        self._transactions_cache.clear()
+
         if isinstance(response, dict):
             return response
 
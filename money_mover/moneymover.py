@@ -1,20 +1,32 @@
 """Contains MoneyMover class, the main user interface with the script"""
 
-import json
+import functools
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Literal
 
+import numpy as np
 import pandas as pd
 
 from .ing_parser import IngParser
 from .moneylover_api import MoneyLoverClient
 from .prompts import CategorySelector, UserPrompts
 
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson is optional, json.loads also accepts bytes
+    from json import loads as json_loads
+
 ui = UserPrompts()
 
 
+def _to_cents(amounts: pd.Series) -> pd.Series:
+    """Converts amounts to integer cents, missing values are kept"""
+    return (amounts * 100).round().astype("Int64")
+
+
 class MoneyMover:
     """
     Manages the movement of transactions between ING bank statements and MoneyLover.
@@ -55,15 +67,23 @@ class MoneyMover:
     ) -> None:
         script_dir = Path(__file__).resolve().parent
         self._presets_path = script_dir / "resources" / presets_fname
+        self._raw_presets: dict[Path, dict] = {}
         self.transaction_presets = self._load_presets(self._presets_path)
+        self._preset_conditions = self._compile_preset_conditions()
+        # Logs in and loads the categories on the first request
         self.ml_api = MoneyLoverClient(email, password)
-        self._validate_presets()
-        self.bank_statement = IngParser(bank_statement_folder)
+        self._presets_validated = False
+        self.bank_statement = IngParser(
+            bank_statement_folder, usecols=self._get_preset_columns()
+        )
         self.ml_transactions: pd.DataFrame
         self.active_wallet: pd.Series
         self.active_wallet_name: str
         self.active_wallet_id: str
         self.wallet_categories: pd.DataFrame
+        self._category_ids: dict[tuple[str, str], str]
+        self._selectable_categories: dict[str, pd.DataFrame]
+        self._classified_cache: tuple[tuple, pd.DataFrame] | None = None
 
     def set_wallet(self) -> None:
         """Choose an active MoneyLover wallet for your next actions."""
@@ -71,8 +91,33 @@ class MoneyMover:
         self.active_wallet_name = self.active_wallet["name"]
         self.active_wallet_id = self.active_wallet["_id"]
 
-        mask = self.ml_api.categories["wallet_id"] == self.active_wallet_id
-        self.wallet_categories = self.ml_api.categories[mask]
+        self.wallet_categories = self.ml_api.categories_for_wallet(
+            self.active_wallet_id
+        ).astype({"type": "category", "parent": "category"})
+
+        # Categories are loaded by now, presets are checked once
+        if not self._presets_validated:
+            self._validate_presets()
+            self._presets_validated = True
+
+        # The first _id is used if a name is repeated within the type
+        unique_categories = self.wallet_categories.drop_duplicates(
+            ["name", "type"]
+        )
+        self._category_ids = dict(
+            zip(
+                zip(unique_categories["name"], unique_categories["type"]),
+                unique_categories["_id"],
+            )
+        )
+
+        # Categories shown for selection, unique by name within each type
+        self._selectable_categories = {
+            category_type: categories.drop_duplicates("name")
+            for category_type, categories in self.wallet_categories.groupby(
+                "type", observed=True, sort=False
+            )
+        }
 
     @property
     def wallets(self) -> pd.DataFrame:
@@ -118,28 +163,26 @@ class MoneyMover:
 
     def print_bank_report(self) -> None:
         """Prints transactions highlighting added and recongnized entries"""
-        self.request_transactions(self.bank_statement.date_range)
-        df = self.bank_statement.transactions
-
-        df = self._check_if_already_added(df)
-        df = self._compare_to_presets(df)
+        df = self._classified_bank_df()
 
         ui.print_report(df)
 
     def print_user_presets(self) -> None:
         """Prints user presets from the json file"""
-        df = self._load_presets_into_df()
+        print(self.presets_df)
 
-        print(df)
+    @functools.cached_property
+    def presets_df(self) -> pd.DataFrame:
+        """Returns user presets as a multiindex dataframe"""
+        return self._load_presets_into_df()
 
     def display_categories(
         self, transaction_type: Literal["expense", "income"]
     ) -> None:
         """Shows categories for the selected wallet"""
 
-        transaction_mask = self.wallet_categories["type"] == transaction_type
-        wallet_categories = self.wallet_categories[transaction_mask]
-        CategorySelector(wallet_categories).run()
+        wallet_categories = self._get_selectable_categories(transaction_type)
+        CategorySelector(wallet_categories, already_unique=True).run()
 
     def transfer_bank_transactions(self) -> pd.DataFrame:
         """Transfers transactions from the latest ing bank statement to the
@@ -157,24 +200,66 @@ class MoneyMover:
             Transactions which were not transferred from the file and require
             manual entry.
         """
-        self.request_transactions(self.bank_statement.date_range)
-        tr_df = self.bank_statement.transactions
-        tr_df = self._check_if_already_added(tr_df)
-        tr_df = self._compare_to_presets(tr_df)
-
-        transactions_to_add = tr_df[~tr_df["is_in_ml"] & tr_df["has_preset"]]
+        _, transactions_to_add, remaining = self._classify_bank()
 
         if ui.prompt_adding(transactions_to_add):
-            self._transfer_from_presets(transactions_to_add)
-
-        remaining = tr_df[~(tr_df["is_in_ml"] | tr_df["has_preset"])]
+            try:
+                self._transfer_from_presets(transactions_to_add)
+            finally:
+                # Some transactions may be added even if others failed
+                self._classified_cache = None
 
         if ui.promt_manual_entry(remaining):
-            for idx, transaction in remaining.iterrows():
+            for idx, transaction in remaining.to_dict("index").items():
                 self._fill_manually(idx, transaction)
 
         return remaining
 
+    def _classify_bank(
+        self,
+    ) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """Splits bank transactions by their record status.
+
+        Returns
+        -------
+        tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]
+            Transactions already in MoneyLover, transactions to add with a
+            preset and transactions requiring manual entry. The groups don't
+            overlap.
+        """
+        df = self._classified_bank_df()
+
+        # Masks are computed once on plain arrays
+        is_in_ml = df["is_in_ml"].to_numpy(bool)
+        to_add = df["has_preset"].to_numpy(bool) & ~is_in_ml
+        requires_entry = ~(is_in_ml | to_add)
+
+        return df[is_in_ml], df[to_add], df[requires_entry]
+
+    def _classified_bank_df(self) -> pd.DataFrame:
+        """Returns bank transactions with "is_in_ml" and "has_preset" flags.
+
+        The result is reused for the same wallet and statement until new
+        transactions are added to MoneyLover.
+
+        Returns
+        -------
+        pd.DataFrame
+            Bank transactions compared to MoneyLover and the presets
+        """
+        key = (self.active_wallet_id, self.bank_statement.date_range)
+        if self._classified_cache is not None:
+            cached_key, cached_df = self._classified_cache
+            if cached_key == key:
+                return cached_df
+
+        self.request_transactions(self.bank_statement.date_range)
+        df = self._check_if_already_added(self.bank_statement.transactions)
+        df = self._compare_to_presets(df)
+
+        self._classified_cache = (key, df)
+        return df
+
     def _check_if_already_added(
         self, bank_transactions: pd.DataFrame
     ) -> pd.DataFrame:
@@ -198,16 +283,23 @@ class MoneyMover:
             bank_transactions["is_in_ml"] = False
             return bank_transactions
 
-        is_same_amount = bank_transactions["amount"].isin(
-            self.ml_transactions["amount"]
+        # Compare (amount, date) pairs, so an amount from one day and a date
+        # from another record don't count as a match. Amounts are compared
+        # in whole cents, float values of the same sum may differ slightly.
+        bank_pairs = pd.MultiIndex.from_arrays(
+            [
+                _to_cents(bank_transactions["amount"]),
+                bank_transactions["date"],
+            ]
         )
-        is_same_date = bank_transactions["date"].isin(
-            self.ml_transactions["date"]
+        ml_pairs = pd.MultiIndex.from_arrays(
+            [
+                _to_cents(self.ml_transactions["amount"]),
+                self.ml_transactions["date"],
+            ]
         )
 
-        is_in_ml = is_same_amount & is_same_date
-
-        bank_transactions["is_in_ml"] = is_in_ml
+        bank_transactions["is_in_ml"] = bank_pairs.isin(ml_pairs)
 
         return bank_transactions
 
@@ -226,20 +318,33 @@ class MoneyMover:
         pd.DataFrame
             Bank transactions with identified presets and their info
         """
-        transactions_df["has_preset"] = False
-        preset_columns = ["note", "category_name", "type"]
+        n_rows = len(transactions_df)
+        has_preset = np.zeros(n_rows, dtype=bool)
+        # Labels are collected in arrays and attached to the table at once
+        labels = {
+            column: np.full(n_rows, np.nan, dtype=object)
+            for column in ["note", "category_name", "type"]
+        }
+        # Masks shared by presets with the same condition, (column, pattern)
+        match_cache: dict[tuple[str, str], np.ndarray] = {}
+
+        for preset, conditions in zip(
+            self.transaction_presets, self._preset_conditions
+        ):
+            is_matched = self._is_preset_matched(
+                transactions_df, conditions, match_cache
+            )
+            # The first matching preset wins
+            to_label = is_matched & ~has_preset
+            if not to_label.any():
+                # The label is only required for presets in use
+                continue
 
-        for idx, bank_transaction in transactions_df.iterrows():
-            for preset in self.transaction_presets:
-                if self._is_preset_matched(bank_transaction, preset):
-                    transactions_df.at[idx, "has_preset"] = True
-                    for column in preset_columns:
-                        transactions_df.at[idx, column] = preset["label"][
-                            column
-                        ]
-                    break
+            for column, values in labels.items():
+                np.copyto(values, preset["label"][column], where=to_label)
+            has_preset |= to_label
 
-        return transactions_df
+        return transactions_df.assign(**labels, has_preset=has_preset)
 
     def _transfer_from_presets(self, transactions_df: pd.DataFrame) -> None:
         """Populates a MoneLover wallet with transactions from the Dataframe.
@@ -256,49 +361,152 @@ class MoneyMover:
         -------
         pd.DataFrame
             Dataframe with unmatched transactions
+
+        Raises
+        ------
+        Exception
+            The error of the first failed row, after every row is reported
         """
-        for idx, transaction in transactions_df.iterrows():
-            payload = self._create_payload_from_preset(transaction)
-            self.ml_api.add_transaction(**payload)
+        payloads = {
+            idx: self._create_payload_from_preset(transaction)
+            for idx, transaction in transactions_df.to_dict("index").items()
+        }
 
-            print(
-                f"Row {idx}: {payload['note']}: ",
-                f"{payload['amount']} - Added to Moneylover",
-            )
+        # Log in before the threads start, the token is loaded only once
+        _ = self.ml_api.access_token
+
+        # Requests are I/O bound, send them concurrently. Every row is
+        # reported, so a failed row doesn't hide the ones already added.
+        errors = {}
+        max_workers = min(8, len(payloads)) or 1
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self.ml_api.add_transaction, **payload): idx
+                for idx, payload in payloads.items()
+            }
+
+            for future in as_completed(futures):
+                idx = futures[future]
+                payload = payloads[idx]
+                try:
+                    future.result()
+                except Exception as e:  # pylint: disable=broad-except
+                    errors[idx] = e
+                    status = f"Failed to add: {e}"
+                else:
+                    status = "Added to Moneylover"
+
+                print(
+                    f"Row {idx}: {payload['note']}: ",
+                    f"{payload['amount']} - {status}",
+                )
+
+        if errors:
+            first_failed = next(idx for idx in payloads if idx in errors)
+            raise errors[first_failed]
 
     def _is_preset_matched(
-        self, bank_transaction: pd.Series, preset: dict
-    ) -> bool:
-        """Checks if preset condition is met by the bank transaction.
+        self,
+        transactions_df: pd.DataFrame,
+        conditions: dict[str, re.Pattern],
+        match_cache: dict[tuple[str, str], np.ndarray] | None = None,
+    ) -> np.ndarray:
+        """Checks which bank transactions meet the preset conditions.
 
         Parameters
         ----------
-        bank_transaction : pd.Series
-            A row with bank transaction details
-        preset : dict
-            Filter preset with note and category
+        transactions_df : pd.DataFrame
+            Dataframe with bank transactions
+        conditions : dict[str, re.Pattern]
+            Compiled preset conditions for the columns
+        match_cache : dict[tuple[str, str], np.ndarray], optional
+            Already computed masks by (column, pattern), updated in place
+
+        Returns
+        -------
+        np.ndarray
+            Boolean mask, True if all preset requirements are matched
+        """
+        if match_cache is None:
+            match_cache = {}
+
+        is_matched = np.ones(len(transactions_df), dtype=bool)
+
+        for column, pattern in conditions.items():
+            key = (column, pattern.pattern)
+            if key not in match_cache:
+                match_cache[key] = self._match_column(
+                    transactions_df, column, pattern
+                )
+            is_matched &= match_cache[key]
+
+        return is_matched
+
+    def _match_column(
+        self, transactions_df: pd.DataFrame, column: str, pattern: re.Pattern
+    ) -> np.ndarray:
+        """Matches a pattern against a column of bank transactions.
+
+        Statements repeat the same names and codes a lot, so the pattern is
+        only tested once per unique value.
+
+        Parameters
+        ----------
+        transactions_df : pd.DataFrame
+            Dataframe with bank transactions
+        column : str
+            Column to check
+        pattern : re.Pattern
+            Compiled preset condition
 
         Returns
         -------
-        bool
-            True if all preset requirements are matched, False otherwise
+        np.ndarray
+            Boolean mask, True where the value matches the pattern
         """
-        conditions = preset["conditions"]
+        if column not in transactions_df:
+            # Missing columns are matched as empty strings
+            is_matched = pattern.match("") is not None
+            return np.full(len(transactions_df), is_matched)
 
-        for column, substring in conditions.items():
-            transaction_value = str(bank_transaction.get(column, ""))
-            if not re.match(substring, transaction_value, re.IGNORECASE):
-                return False
+        codes, uniques = pd.factorize(
+            transactions_df[column], use_na_sentinel=False
+        )
+        # Values are matched as str() of a single cell, e.g. dates with the
+        # time "2024-01-01 00:00:00". Missing values of any dtype as "nan".
+        unique_strings = (
+            "nan" if pd.isna(value) else str(value) for value in uniques
+        )
+        unique_matches = np.fromiter(
+            (pattern.match(value) is not None for value in unique_strings),
+            dtype=bool,
+            count=len(uniques),
+        )
+        return unique_matches[codes]
 
-        return True
+    def _compile_preset_conditions(self) -> list[dict[str, re.Pattern]]:
+        """Compiles preset condition regular expressions once.
 
-    def _create_payload_from_preset(self, bank_transaction: pd.Series) -> dict:
+        Returns
+        -------
+        list[dict[str, re.Pattern]]
+            Compiled conditions in the same order as the presets
+        """
+        return [
+            {
+                column: re.compile(pattern, re.IGNORECASE)
+                for column, pattern in preset["conditions"].items()
+            }
+            for preset in self.transaction_presets
+        ]
+
+    def _create_payload_from_preset(self, bank_transaction: dict) -> dict:
         """Creates keyword arguments for the MoneyLover add_transaction method
         based on a preset filter.
 
         Parameters
         ----------
-        bank_transaction : pd.Series
+        bank_transaction : dict
             A row with bank transaction details
         preset : dict
             Filter preset with note and category
@@ -336,47 +544,44 @@ class MoneyMover:
         return payload
 
     def _get_category_id(self, category_name: str, category_type: str) -> str:
-        """Return a corresponding category id from a cached categories file.
+        """Return a corresponding category id for the active wallet.
 
         Parameters
         ----------
         category_name : str
             Name of the MoneyLover category for the transaction
+        category_type : str
+            Category type: expense, income or debt/loan
 
         Returns
         -------
         str
             Unique category _id
         """
+        try:
+            return self._category_ids[(category_name, category_type)]
+        except KeyError as e:
+            raise ValueError(
+                f"No matching category found for {category_name}"
+            ) from e
+
+    def _get_selectable_categories(self, category_type: str) -> pd.DataFrame:
+        """Returns wallet categories of the type, unique by name"""
+        return self._selectable_categories.get(
+            category_type, self.wallet_categories.iloc[:0]
+        )
 
-        df = pd.read_csv(self.ml_api.categories_file)
-        wallet_filter = df["wallet_id"] == self.active_wallet_id
-        category_filter = df["name"] == category_name
-        type_filter = df["type"] == category_type
-
-        category_id = df[wallet_filter & category_filter & type_filter]
-        if category_id.empty:
-            raise ValueError(f"No matching category found for {category_name}")
-        if category_id["_id"].size > 1:
-            print(
-                f"{category_id['_id'].size} id matches for the ",
-                f"name {category_name}.",
-            )
-        return category_id.iloc[0]["_id"]
-
-    def _fill_manually(self, id_num: int, bank_transaction: pd.Series):
+    def _fill_manually(self, id_num: int, bank_transaction: dict):
         """Provides CLI for manually entering the transactions"""
-        # categories_df = self.ml_api.categories
-        categories_df = self.wallet_categories
-
         transaction_type = ui.choose_transaction_type(id_num, bank_transaction)
         if transaction_type is None:
             return
-        transaction_mask = categories_df["type"] == transaction_type
-        # & (categories_df["wallet_id"] == self.active_wallet_id)
-        # wallet_categories = categories_df[transaction_mask]
-        applicable_categories = categories_df[transaction_mask]
-        category = ui.choose_category(applicable_categories)
+        applicable_categories = self._get_selectable_categories(
+            transaction_type
+        )
+        category = ui.choose_category(
+            applicable_categories, already_unique=True
+        )
 
         if category is None:
             return
@@ -389,6 +594,7 @@ class MoneyMover:
         note = input("Write a transaction note: ")
         payload = self._create_payload(category_id, bank_transaction, note)
         self.ml_api.add_transaction(**payload)
+        self._classified_cache = None
         print("Transaction added\n")
 
     def _format_transactions(self, response: dict) -> pd.DataFrame:
@@ -405,20 +611,14 @@ class MoneyMover:
         pd.DataFrame
             Dataframe with formatted MoneyLover transactions
         """
-        transactions_info = []
-
-        for transaction in response.get("transactions", []):
-            printable = {
-                "note": transaction.get("note"),
-                "amount": round(transaction.get("amount", 0), 2),
-                "date": pd.to_datetime(
-                    transaction.get("displayDate")
-                ).tz_localize(None),
-                "category": transaction.get("category", {}).get("name"),
-            }
-            transactions_info.append(printable)
-
-        df = pd.DataFrame(transactions_info)
+        df = pd.json_normalize(response.get("transactions", []))
+        df = df.reindex(
+            columns=["note", "amount", "displayDate", "category.name"]
+        ).set_axis(["note", "amount", "date", "category"], axis=1)
+
+        df["amount"] = df["amount"].astype("float64").fillna(0).round(2)
+        df["date"] = pd.to_datetime(df["date"]).dt.tz_localize(None)
+        df["category"] = df["category"].astype("category")
         return df
 
     def _load_presets(
@@ -438,8 +638,11 @@ class MoneyMover:
         if keys is None:
             keys = ["expenses", "incomes"]
 
-        with open(path, "r", encoding="utf8") as json_file:
-            raw_presets = json.load(json_file)
+        # The file is read once, the template is taken from the same json
+        if path not in self._raw_presets:
+            with open(path, "rb") as json_file:
+                self._raw_presets[path] = json_loads(json_file.read())
+        raw_presets = self._raw_presets[path]
 
         presets = []
         for key in keys:
@@ -448,29 +651,29 @@ class MoneyMover:
 
         return presets
 
-    def _flatten_for_dataframe(self, json_data: dict):
-        """Flattens a nested dictionary by combining keys into tuples."""
-        normalized_data = [
-            {
-                (outer_key, inner_key): inner_val
-                for outer_key, inner_dict in item.items()
-                for inner_key, inner_val in inner_dict.items()
-            }
-            for item in json_data
-        ]
-        return normalized_data
+    def _get_preset_columns(self) -> set[str]:
+        """Returns bank statement columns used in the preset conditions"""
+        return {
+            column
+            for preset in self.transaction_presets
+            for column in preset["conditions"]
+        }
 
     def _load_presets_into_df(self) -> pd.DataFrame:
         """Loads preset file into a multiindex dataframe"""
-        template = self._load_presets(self._presets_path, ["example_template"])
-        preferred_order = self._flatten_for_dataframe(template)
-        preferred_order = list(preferred_order[0].keys())
-
-        normalized_data = self._flatten_for_dataframe(self.transaction_presets)
+        # A separator which can't appear in the json keys
+        sep = "\x1f"
+        df = pd.json_normalize(self.transaction_presets, sep=sep)
 
-        df = pd.DataFrame(normalized_data, columns=preferred_order)
+        # Columns are ordered and limited as in the template, if it exists
+        template = self._load_presets(self._presets_path, ["example_template"])
+        if template:
+            template_df = pd.json_normalize(template[:1], sep=sep)
+            df = df.reindex(columns=template_df.columns)
 
-        df.columns = pd.MultiIndex.from_tuples(df.columns)
+        df.columns = pd.MultiIndex.from_tuples(
+            [tuple(column.split(sep)) for column in df.columns]
+        )
 
         df = df.dropna(axis=1, how="all")
         df = df.fillna("")
@@ -479,7 +682,7 @@ class MoneyMover:
 
     def _validate_presets(self) -> bool:
         """Checks that user presets use valid categories"""
-        df = self._load_presets_into_df()
+        df = self.presets_df
 
         valid_mask = df["label", "category_name"].isin(
             self.ml_api.categories["name"]
@@ -5,7 +5,14 @@ import os
 
 import pandas as pd
 
-TRANSACTION_TYPES = {"d": "debt/loan", "i": "income", "e": "expense"}
+# User input -> transaction type, None skips the transaction
+TRANSACTION_TYPES = {
+    "d": "debt/loan",
+    "i": "income",
+    "e": "expense",
+    "s": None,
+}
+YES_NO_ANSWERS = {"y": True, "n": False}
 
 
 class UserPrompts:
@@ -51,20 +58,22 @@ class UserPrompts:
         )
         while True:
             user_input = input("\n>>")
-            if user_input == "s":
-                print("Skipping transaction")
-                return None
-            elif user_input in TRANSACTION_TYPES:
-                transaction_type = TRANSACTION_TYPES.get(user_input)
-                print(f"---selected {transaction_type}")
-                return transaction_type
-            else:
+            if user_input not in TRANSACTION_TYPES:
                 self._invalid_input()
                 continue
 
-    def choose_category(self, categories: pd.DataFrame):
+            transaction_type = TRANSACTION_TYPES[user_input]
+            if transaction_type is None:
+                print("Skipping transaction")
+            else:
+                print(f"---selected {transaction_type}")
+            return transaction_type
+
+    def choose_category(
+        self, categories: pd.DataFrame, already_unique: bool = False
+    ):
         """Prompts to select a transaction category"""
-        selected_category = CategorySelector(categories).run()
+        selected_category = CategorySelector(categories, already_unique).run()
         return selected_category
 
     def promt_manual_entry(self, bank_transactions: pd.DataFrame) -> bool:
@@ -85,17 +94,14 @@ class UserPrompts:
         while not bank_transactions.empty:
             print(f"Would you like to add {len(bank_transactions)} remaining "
                   f"transations manually?")
-            for idx, row in bank_transactions.iterrows():
+            for idx, row in bank_transactions.to_dict("index").items():
                 self.print_line(idx, row)
 
             ans = input("(y/n):")
-            if ans == "y":
-                return True
-            elif ans == "n":
-                return False
-            else:
-                self._invalid_input()
-                continue
+            if ans in YES_NO_ANSWERS:
+                return YES_NO_ANSWERS[ans]
+
+            self._invalid_input()
 
     def print_report(self, transactions: pd.DataFrame) -> None:
         """Prints colored summary of bank transactions.
@@ -106,7 +112,7 @@ class UserPrompts:
             A table with transactions and their record status
         """
 
-        for idx, row in transactions.iterrows():
+        for idx, row in transactions.to_dict("index").items():
             if row["is_in_ml"]:
                 text = "In MoneyLover"
                 color = TextColors.OKGREEN
@@ -125,14 +131,14 @@ class UserPrompts:
             )
         print(f"{TextColors.DEFAULT}")
 
-    def print_line(self, idx:int, transaction: pd.Series, text="", color=""):
+    def print_line(self, idx:int, transaction: dict, text="", color=""):
         """Prints the main transaction info in a formatted line
 
         Parameters
         ----------
         idx : int
             Transaction row index
-        transaction : pd.Series
+        transaction : dict
             Transaction to print
         text : str, optional
             Short text at the end, by default ""
@@ -170,17 +176,14 @@ class UserPrompts:
             return False
 
         print("Do you want to add following entries?")
-        for idx, row in transactions.iterrows():
+        for idx, row in transactions.to_dict("index").items():
             self.print_line(idx, row)
         while True:
             ans = input("(y/n):")
-            if ans == "y":
-                return True
-            elif ans == "n":
-                return False
-            else:
-                self._invalid_input()
-                continue
+            if ans in YES_NO_ANSWERS:
+                return YES_NO_ANSWERS[ans]
+
+            self._invalid_input()
 
     def _invalid_input(self):
 
@@ -194,13 +197,34 @@ class CategorySelector:
     ----------
     categories : DataFrame
         MoneyLover categories as dataframe (MoneyLoverClient attribute)
+    already_unique : bool, optional
+        Pass True if category names are already unique, by default False
     
     """
 
-    def __init__(self, categories: pd.DataFrame) -> None:
-        self.categories = categories.drop_duplicates("name")
+    def __init__(
+        self, categories: pd.DataFrame, already_unique: bool = False
+    ) -> None:
+        if already_unique:
+            self.categories = categories
+        else:
+            self.categories = categories.drop_duplicates("name")
         self.selected_category: str | None
 
+        # Categories don't change during the selection, prepare lookups once
+        self.parent_categories = self._count_subcategories(
+            self.categories[self.categories["parent"].isna()]
+        )
+        self._ids_by_name = dict(
+            zip(self.categories["name"], self.categories["_id"])
+        )
+        self._children_by_parent = {
+            str(parent_id): children.reset_index(drop=True)
+            for parent_id, children in self.categories.groupby(
+                "parent", observed=True
+            )["name"]
+        }
+
     def run(self) -> str | None:
         """Prints the available categories and asks for user input"""
         while True:
@@ -274,36 +298,23 @@ class CategorySelector:
             elif user_input == "":
                 return self.selected_category
 
-    @property
-    def parent_categories(self) -> pd.DataFrame:
-        """Returns top-level categories"""
-        mask = self.categories["parent"].isna()
-        return self._count_subcategories(self.categories[mask])
-
     def _count_subcategories(self, parents_df: pd.DataFrame) -> pd.DataFrame:
         """Count number of sub-categories"""
         children_count = self.categories["parent"].value_counts()
-        children_count.rename("sub-categories", inplace=True)
-
-        df = pd.merge(
-            parents_df,
-            children_count,
-            left_on="_id",
-            right_on="parent",
-            how="left",
-        )
-        df["sub-categories"] = df["sub-categories"].fillna(0).astype(int)
-        df["sub-categories"] = df["sub-categories"].replace(0, "")
+
+        # The selection uses positional labels, as in a merged table
+        df = parents_df.reset_index(drop=True)
+        sub_categories = df["_id"].map(children_count).fillna(0).astype(int)
+        df["sub-categories"] = sub_categories.replace(0, "")
 
         return df
 
     def _get_children(self, parent_category: str) -> pd.Series:
         """Return sub-categories of the parent."""
-        parent = self.categories["name"] == parent_category
-        parent_id = self.categories.loc[parent, "_id"].iloc[0]
-        children_mask = self.categories["parent"] == str(parent_id)
-        children = self.categories[children_mask]["name"].drop_duplicates()
-        return children.reset_index(drop=True)
+        parent_id = self._ids_by_name[parent_category]
+        return self._children_by_parent.get(
+            str(parent_id), pd.Series(name="name", dtype=object)
+        )
 
 
 class TextColors:
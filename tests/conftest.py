@@ -0,0 +1,20 @@
+"""Shared fixtures for the tests
+
+For a quick local run, stop on the first failure:
+    pytest -q -x tests/test_moneylover_api.py
+
+The tests can run in parallel with pytest-xdist:
+    pytest -n auto
+"""
+
+import os
+
+import pytest
+from dotenv import load_dotenv
+
+
+@pytest.fixture(name="credentials", scope="session")
+def fixture_credentials():
+    """MoneyLover email and password from the environment or .env file"""
+    load_dotenv()
+    return os.getenv("EMAIL"), os.getenv("PASSWORD")
@@ -2,20 +2,35 @@
 
 # pylint: disable=W0212
 
+import os
 import re
+import shutil
 from datetime import datetime
 from pathlib import Path
 
 import pandas as pd
 import pytest
 
+from money_mover import ing_parser as ing_parser_module
 from money_mover.ing_parser import COLUMNS, IngParser
 
+STATEMENT_FILE = (
+    Path(__file__).parent / "NL55INGB0000000000_01-01-2024_01-02-2024.csv"
+)
+
+
+@pytest.fixture(name="statement_folder")
+def fixture_statement_folder(tmp_path):
+    """Temporary folder with a copy of the dummy statement, so the parquet
+    caches are not written next to the tests"""
+    shutil.copy(STATEMENT_FILE, tmp_path)
+    return tmp_path
+
 
 @pytest.fixture(name="ing_parser")
-def fixture_ing_parser():
+def fixture_ing_parser(statement_folder):
     """Fixture a parcer with dummy file"""
-    return IngParser(statement_folder="./tests")
+    return IngParser(statement_folder=str(statement_folder))
 
 
 def test_find_file(ing_parser):
@@ -71,3 +86,78 @@ def test_init(ing_parser):
 
     # Check if _recent_bank_statement attribute is set
     assert isinstance(ing_parser._recent_bank_statement, Path)
+
+
+def test_statement_cache(statement_folder, monkeypatch):
+    """The parsed statement is cached and reused until the csv changes"""
+    # Cache miss, the csv is parsed and saved as parquet
+    parsed = IngParser(statement_folder=str(statement_folder)).transactions
+    cache_files = list(statement_folder.glob("*.parquet"))
+    assert len(cache_files) == 1
+
+    # Cache hit, the csv is not parsed
+    def fail_read_csv(*args, **kwargs):
+        raise AssertionError("csv is parsed instead of using the cache")
+
+    with monkeypatch.context() as mp:
+        mp.setattr(ing_parser_module.pd, "read_csv", fail_read_csv)
+        cached = IngParser(statement_folder=str(statement_folder)).transactions
+    pd.testing.assert_frame_equal(cached, parsed)
+
+    # Modified statement, the stale cache is replaced
+    statement = statement_folder / STATEMENT_FILE.name
+    mtime_ns = statement.stat().st_mtime_ns + 1_000_000_000
+    os.utime(statement, ns=(mtime_ns, mtime_ns))
+    IngParser(statement_folder=str(statement_folder))
+
+    new_cache_files = list(statement_folder.glob("*.parquet"))
+    assert len(new_cache_files) == 1
+    assert new_cache_files[0] != cache_files[0]
+    assert str(mtime_ns) in new_cache_files[0].name
+
+
+def test_statement_cache_not_writable(statement_folder, monkeypatch, capsys):
+    """The statement is parsed even if the cache can't be saved"""
+
+    def fail_to_parquet(*args, **kwargs):
+        raise OSError("Read-only file system")
+
+    monkeypatch.setattr(pd.DataFrame, "to_parquet", fail_to_parquet)
+    parser = IngParser(statement_folder=str(statement_folder))
+
+    assert not parser.transactions.empty
+    assert not list(statement_folder.glob("*.parquet"))
+    assert "cache is not saved" in capsys.readouterr().out
+
+
+def test_statement_cache_columns(statement_folder):
+    """A cache without the requested columns is not used"""
+    parser = IngParser(
+        statement_folder=str(statement_folder), usecols=["code"]
+    )
+    assert "counterparty" not in parser.transactions
+
+    # The cache of the first parser lacks the column, the csv is parsed again
+    parser = IngParser(
+        statement_folder=str(statement_folder), usecols=["counterparty"]
+    )
+    assert "counterparty" in parser.transactions
+    assert "code" not in parser.transactions
+
+    cache_files = list(statement_folder.glob("*.parquet"))
+    assert len(cache_files) == 1
+    cached = pd.read_parquet(cache_files[0])
+    assert "counterparty" in cached
+
+
+def test_parse_large_statement_in_chunks(statement_folder, monkeypatch):
+    """Chunked reading of large statements gives the same table"""
+    parsed = IngParser(statement_folder=str(statement_folder)).transactions
+    for cache_file in statement_folder.glob("*.parquet"):
+        cache_file.unlink()
+
+    monkeypatch.setattr(ing_parser_module, "LARGE_STATEMENT_SIZE", 0)
+    monkeypatch.setattr(ing_parser_module, "CHUNK_ROWS", 4)
+    chunked = IngParser(statement_folder=str(statement_folder)).transactions
+
+    pd.testing.assert_frame_equal(chunked, parsed)
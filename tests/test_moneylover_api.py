@@ -5,156 +5,226 @@
 import os
 from datetime import datetime, timedelta
 
+import pandas as pd
 import pytest
-from dotenv import load_dotenv
-
-from money_mover.moneylover_api import MoneyLoverClient
-
-load_dotenv()
-
-
-@pytest.fixture(name="ml_client")
-def fixture_ml_client():
-    """Get a class instance for the tests"""
-    email = os.getenv("EMAIL")
-    password = os.getenv("PASSWORD")
-    return MoneyLoverClient(email, password)
-
-
-def test__is_token_valid(ml_client, tmp_path):
-    """Token validation check"""
-    # Create a temporary access token file
-    access_token_file = tmp_path / "access_token.txt"
-    access_token_file.write_text("test_token")
-
-    ml_client.access_token_file = access_token_file
-
-    # Test with token modified 4 days ago
-    creation_time = (datetime.now() - timedelta(days=30)).timestamp()
-    modification_time = (datetime.now() - timedelta(days=4)).timestamp()
-    access_token_file.touch()
-    access_token_file.write_text("test_token")
-    os.utime(access_token_file, (creation_time, modification_time))
-    assert ml_client._is_token_valid()
-
-    # Test with token modified 6 days ago
-    modification_time = (datetime.now() - timedelta(days=6)).timestamp()
-    access_token_file.touch()
-    access_token_file.write_text("test_token")
-    os.utime(access_token_file, (creation_time, modification_time))
-    assert not ml_client._is_token_valid()
-
-
-def test__load_access_token(ml_client, tmp_path):
-    """Reading token file"""
-    # Create a temporary access token file
-    access_token_file = tmp_path / "access_token.txt"
-    access_token_file.write_text("test_token")
-
-    ml_client.access_token_file = access_token_file
-
-    # Test loading access token from file
-    assert ml_client._load_access_token() == "test_token"
+import responses
+
+from money_mover.moneylover_api import CATEGORY_TYPES, MoneyLoverClient
+
+pytestmark = [pytest.mark.filterwarnings("ignore::DeprecationWarning")]
+
+EXPECTED_USER_KEYS = frozenset(
+    {
+        "_id",
+        "email",
+        "client_setting",
+        "subscribeProduct",
+        "tags",
+        "icon_package",
+        "limitDevice",
+        "purchased",
+        "deviceId",
+    }
+)
+
+EXPECTED_WALLET_KEYS = frozenset(
+    {
+        "_id",
+        "name",
+        "currency_id",
+        "owner",
+        "sortIndex",
+        "transaction_notification",
+        "archived",
+        "account_type",
+        "exclude_total",
+        "icon",
+        "listUser",
+        "createdAt",
+        "updateAt",
+        "isDelete",
+        "balance",
+    }
+)
+
+EXPECTED_SUMMARY_KEYS = frozenset({"_id", "name", "balance", "currency"})
+
+EXPECTED_CATEGORY_KEYS = frozenset(
+    {"wallet_id", "wallet_name", "type", "name", "_id", "parent"}
+)
+
+USER_INFO = {
+    "_id": "user_id",
+    "email": "user@example.com",
+    "client_setting": {},
+    "subscribeProduct": "",
+    "tags": [],
+    "icon_package": [],
+    "limitDevice": 5,
+    "purchased": False,
+    "deviceId": "device_id",
+}
+
+WALLETS = [
+    {
+        "_id": "wallet_id",
+        "name": "Wallet",
+        "currency_id": 1,
+        "owner": "user_id",
+        "sortIndex": 0,
+        "transaction_notification": False,
+        "archived": False,
+        "account_type": 0,
+        "exclude_total": False,
+        "icon": "icon",
+        "listUser": [],
+        "createdAt": "2024-01-01T00:00:00.000Z",
+        "updateAt": "2024-01-01T00:00:00.000Z",
+        "isDelete": False,
+        "balance": [{"EUR": 100.0}],
+    }
+]
+
+CATEGORIES = [
+    {"_id": "food_id", "name": "Food", "type": 2, "parent": None},
+    {"_id": "cafe_id", "name": "Cafe", "type": 2, "parent": "food_id"},
+    {"_id": "salary_id", "name": "Salary", "type": 1, "parent": None},
+]
+
+
+def add_api_response(mock, path, data):
+    """Registers a successful MoneyLover API response for the path"""
+    mock.post(MoneyLoverClient.api_url + path, json={"error": 0, "data": data})
+
+
+@pytest.fixture(name="ml_client", scope="session")
+def fixture_ml_client(credentials, tmp_path_factory):
+    """Get a class instance, shared by the tests of an xdist worker.
+
+    Token and categories files are kept in a temporary folder of the worker,
+    the saved token is used on the first request, so no login is needed.
+    """
+    email, password = credentials
+    # Set by pytest-xdist, the tests also run without it
+    worker_id = os.environ.get("PYTEST_XDIST_WORKER", "master")
+    resources_dir = tmp_path_factory.mktemp(f"resources-{worker_id}")
+    access_token_file = resources_dir / "access_token.txt"
+    access_token_file.write_bytes(b"test_token")
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(MoneyLoverClient, "access_token_file", access_token_file)
+        mp.setattr(
+            MoneyLoverClient,
+            "categories_file",
+            resources_dir / "categories.parquet",
+        )
+        yield MoneyLoverClient(email, password)
+
+
+@pytest.fixture(name="token_dir", scope="session")
+def fixture_token_dir(tmp_path_factory):
+    """Folder for the token files, tests use their own file names"""
+    return tmp_path_factory.mktemp("tokens")
+
+
+@pytest.fixture(name="api_snapshot", scope="session")
+def fixture_api_snapshot(ml_client):
+    """Responses of the read-only API methods, requested once per session"""
+    with responses.RequestsMock() as mock:
+        add_api_response(mock, "/user/info", USER_INFO)
+        add_api_response(mock, "/wallet/list", WALLETS)
+        add_api_response(mock, "/category/list", CATEGORIES)
+
+        return {
+            "user": ml_client.get_user_info(),
+            "wallets": ml_client.get_wallets(),
+            "summary": ml_client.get_wallets_summary(),
+            "categories": ml_client.load_categories(True),
+        }
+
+
+@pytest.mark.parametrize("age_days, is_valid", [(4, True), (6, False)])
+def test_access_token_file(
+    ml_client, token_dir, request, monkeypatch, age_days, is_valid
+):
+    """Saving, reading and validating the token file"""
+    access_token_file = token_dir / f"{request.node.name}.txt"
+
+    # The client is shared, the token file is restored after the test
+    monkeypatch.setattr(ml_client, "access_token_file", access_token_file)
 
     # Test when access token file does not exist
-    access_token_file.unlink()
     assert ml_client._load_access_token() is None
 
-
-def test__save_access_token(ml_client, tmp_path):
-    """Saving token string to a file"""
-    # Create a temporary access token file
-    access_token_file = tmp_path / "access_token.txt"
-
-    ml_client.access_token_file = access_token_file
-    ml_client._save_access_token("test_token")
-
     # Check if access token is saved correctly
+    ml_client._save_access_token("test_token")
     assert access_token_file.read_text() == "test_token"
 
+    # Test with token modified age_days ago
+    now = datetime.now()
+    creation_time = (now - timedelta(days=30)).timestamp()
+    modification_time = (now - timedelta(days=age_days)).timestamp()
+    os.utime(access_token_file, (creation_time, modification_time))
+    assert ml_client._is_token_valid() is is_valid
+
+    # An expired token is not loaded
+    expected_token = "test_token" if is_valid else None
+    assert ml_client._load_access_token() == expected_token
 
-def test__get_token(ml_client):
+
+@pytest.mark.live
+def test__get_token(ml_client, credentials):
     """Getting token string from the server"""
-    email = os.getenv("EMAIL")
-    password = os.getenv("PASSWORD")
+    email, password = credentials
     assert isinstance(ml_client._get_token(email, password), str)
 
 
-def test_get_user_info(ml_client):
+def test_get_user_info(api_snapshot):
     """Check user info retrieved"""
+    missing = EXPECTED_USER_KEYS - api_snapshot["user"].keys()
+    assert not missing, f"missing keys: {missing}"
+
 
-    user_info = ml_client.get_user_info()
-    assert all(
-        key in user_info
-        for key in [
-            "_id",
-            "email",
-            "client_setting",
-            "subscribeProduct",
-            "tags",
-            "icon_package",
-            "limitDevice",
-            "purchased",
-            "deviceId",
-        ]
-    )
-
-
-def test_get_wallets(ml_client):
+def test_get_wallets(api_snapshot):
     """Check wallet info"""
-    wallets = ml_client.get_wallets()
+    wallets = api_snapshot["wallets"]
 
     assert len(wallets) != 0
-    assert all(
-        key in wallets[0]
-        for key in [
-            "_id",
-            "name",
-            "currency_id",
-            "owner",
-            "sortIndex",
-            "transaction_notification",
-            "archived",
-            "account_type",
-            "exclude_total",
-            "icon",
-            "listUser",
-            "createdAt",
-            "updateAt",
-            "isDelete",
-            "balance",
-        ]
-    )
-
-
-def test_get_wallets_summary(ml_client):
+    missing = EXPECTED_WALLET_KEYS - wallets[0].keys()
+    assert not missing, f"missing keys: {missing}"
+
+
+def test_get_wallets_summary(api_snapshot):
     """Check summary entries"""
-    wallets_summary = ml_client.get_wallets_summary()
+    wallets_summary = api_snapshot["summary"]
     assert not wallets_summary.empty
-    assert all(
-        key in wallets_summary
-        for key in [
-            "_id",
-            "name",
-            "balance",
-            "currency",
-        ]
-    )
-
-
-def test_load_categories(ml_client):
+    assert EXPECTED_SUMMARY_KEYS <= set(wallets_summary.columns)
+
+
+def test_load_categories(ml_client, api_snapshot):
     """Check category retrieval"""
-    ml_client.load_categories(True)
+    categories = api_snapshot["categories"]
     assert ml_client.categories_file.exists()
+    assert EXPECTED_CATEGORY_KEYS <= set(categories.columns)
+
+    # One row per wallet and category
+    assert len(categories) == len(WALLETS) * len(CATEGORIES)
+    assert set(categories["wallet_id"]) == {w["_id"] for w in WALLETS}
+    assert set(categories["wallet_name"]) == {w["name"] for w in WALLETS}
+    assert categories["_id"].tolist() == [c["_id"] for c in CATEGORIES]
+
+    # Numeric types are replaced with their names
+    assert categories["type"].tolist() == [
+        CATEGORY_TYPES[c["type"]] for c in CATEGORIES
+    ]
+    for column in ("wallet_id", "wallet_name", "type"):
+        assert isinstance(categories[column].dtype, pd.CategoricalDtype)
+
+
+def test_load_categories_from_file(ml_client, api_snapshot):
+    """Saved categories are read back without requests"""
+    with responses.RequestsMock() as mock:
+        categories = ml_client.load_categories()
 
-    assert all(
-        key in ml_client.categories
-        for key in [
-            "wallet_id",
-            "wallet_name",
-            "type",
-            "name",
-            "_id",
-            "parent",
-        ]
-    )
+    assert not mock.calls
+    pd.testing.assert_frame_equal(categories, api_snapshot["categories"])
@@ -0,0 +1,202 @@
+"""Tests for the MoneyMover transaction matching and transfer"""
+
+# pylint: disable=W0212
+
+import pandas as pd
+import pytest
+import responses
+
+from money_mover.moneylover_api import MoneyLoverException
+from money_mover.moneymover import MoneyMover
+
+
+class FakeMoneyLoverClient:
+    """Records added transactions instead of sending them to the API"""
+
+    access_token = "test_token"
+
+    def __init__(self, failing_notes=()):
+        self.added_notes = []
+        self.failing_notes = set(failing_notes)
+
+    def add_transaction(self, **payload):
+        """Fails for the selected notes, records the others"""
+        if payload["note"] in self.failing_notes:
+            raise MoneyLoverException(f"Can't add {payload['note']}")
+        self.added_notes.append(payload["note"])
+        return payload
+
+
+@pytest.fixture(name="money_mover")
+def fixture_money_mover():
+    """MoneyMover without the API client and the bank statement"""
+    money_mover = MoneyMover.__new__(MoneyMover)
+    money_mover.transaction_presets = []
+    money_mover._preset_conditions = []
+    return money_mover
+
+
+def test_init_sends_no_requests(tmp_path):
+    """Login, wallets and categories are deferred to the first use"""
+    with responses.RequestsMock() as mock:
+        MoneyMover(
+            bank_statement_folder=str(tmp_path),
+            presets_fname="example_presets.json",
+        )
+
+    assert not mock.calls
+
+
+def test_transfer_from_presets_reports_every_row(money_mover, capsys):
+    """A failed row is raised only after all the other rows are sent"""
+    money_mover.ml_api = FakeMoneyLoverClient(failing_notes={"Rent"})
+    money_mover.active_wallet_id = "wallet_id"
+    money_mover._category_ids = {
+        ("Groceries", "expense"): "groceries_id",
+        ("Housing", "expense"): "housing_id",
+    }
+    transactions = pd.DataFrame(
+        {
+            "note": ["Jumbo", "Rent", "Albert Heijn"],
+            "category_name": ["Groceries", "Housing", "Groceries"],
+            "type": ["expense", "expense", "expense"],
+            "amount": [10.5, 950.0, 20.25],
+            "date": pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-03"]),
+        }
+    )
+
+    with pytest.raises(MoneyLoverException, match="Rent"):
+        money_mover._transfer_from_presets(transactions)
+
+    assert sorted(money_mover.ml_api.added_notes) == ["Albert Heijn", "Jumbo"]
+
+    output = capsys.readouterr().out
+    assert output.count("Added to Moneylover") == 2
+    assert "Row 1: Rent:  950.0 - Failed to add" in output
+
+
+def set_presets(money_mover, presets):
+    """Assigns presets and compiles their conditions"""
+    money_mover.transaction_presets = presets
+    money_mover._preset_conditions = money_mover._compile_preset_conditions()
+
+
+def make_preset(conditions, note, category_name="Groceries"):
+    """Preset with an expense label"""
+    return {
+        "conditions": conditions,
+        "label": {
+            "note": note,
+            "category_name": category_name,
+            "type": "expense",
+        },
+    }
+
+
+def test_compare_to_presets_first_preset_wins(money_mover):
+    """A row matched by several presets gets the label of the first one"""
+    set_presets(
+        money_mover,
+        [
+            make_preset({"name": "Jumbo"}, "First"),
+            make_preset({"name": "Jumbo|Albert"}, "Second"),
+        ],
+    )
+    transactions = pd.DataFrame({"name": ["Jumbo 123", "Albert Heijn", "NS"]})
+
+    df = money_mover._compare_to_presets(transactions)
+
+    assert df["has_preset"].tolist() == [True, True, False]
+    assert df["note"].iloc[:2].tolist() == ["First", "Second"]
+    assert pd.isna(df.at[2, "note"])
+
+
+def test_compare_to_presets_unmatched_preset_without_label(money_mover):
+    """A preset without a label doesn't fail unless it matches a row"""
+    set_presets(
+        money_mover,
+        [
+            {"conditions": {"name": "Netflix"}},
+            make_preset({"name": "Jumbo"}, "Groceries"),
+        ],
+    )
+    transactions = pd.DataFrame({"name": ["Jumbo 123", "NS"]})
+
+    df = money_mover._compare_to_presets(transactions)
+    assert df["has_preset"].tolist() == [True, False]
+
+    # A matching preset still needs the label
+    with pytest.raises(KeyError):
+        money_mover._compare_to_presets(pd.DataFrame({"name": ["Netflix"]}))
+
+
+def test_compare_to_presets_column_values(money_mover):
+    """Conditions are matched against the cell values as strings"""
+    set_presets(
+        money_mover,
+        [
+            # Conditions on several columns must all match
+            make_preset({"name": "Jumbo", "code": "BA"}, "Jumbo card"),
+            # Dates are matched with the time part
+            make_preset({"date": r"2024-01-02 00:00:00$"}, "Second day"),
+            # Missing values are matched as "nan"
+            make_preset({"code": "nan$"}, "No code"),
+            # Missing columns are matched as empty strings
+            make_preset({"notifications": "$"}, "No notifications"),
+        ],
+    )
+    transactions = pd.DataFrame(
+        {
+            "date": pd.to_datetime(
+                ["2024-01-01", "2024-01-01", "2024-01-02", "2024-01-03"]
+            ),
+            "name": ["Jumbo 123", "Jumbo 123", "NS", "NS"],
+            "code": pd.array(["BA", "GT", "GT", None], dtype="string[pyarrow]"),
+        }
+    )
+
+    df = money_mover._compare_to_presets(transactions)
+
+    assert df["note"].tolist() == [
+        "Jumbo card",
+        "No notifications",
+        "Second day",
+        "No code",
+    ]
+    assert df["has_preset"].all()
+
+
+def test_check_if_already_added(money_mover):
+    """Transactions are matched by (amount in cents, date) pairs"""
+    money_mover.ml_transactions = pd.DataFrame(
+        {
+            "amount": [0.3, 125.43, 10.0],
+            "date": pd.to_datetime(
+                ["2024-01-01", "2024-01-02", "2024-01-05"]
+            ),
+        }
+    )
+    bank_transactions = pd.DataFrame(
+        {
+            # Float sum of the same cents, same pair, amount from another
+            # date, missing amount
+            "amount": [0.1 + 0.2, 125.43, 10.0, float("nan")],
+            "date": pd.to_datetime(
+                ["2024-01-01", "2024-01-02", "2024-01-02", "2024-01-05"]
+            ),
+        }
+    )
+
+    df = money_mover._check_if_already_added(bank_transactions)
+    assert df["is_in_ml"].tolist() == [True, True, False, False]
+
+
+def test_check_if_already_added_empty_wallet(money_mover):
+    """Nothing is added if the wallet has no transactions"""
+    money_mover.ml_transactions = pd.DataFrame(columns=["amount", "date"])
+    bank_transactions = pd.DataFrame(
+        {"amount": [1.0], "date": pd.to_datetime(["2024-01-01"])}
+    )
+
+    df = money_mover._check_if_already_added(bank_transactions)
+    assert not df["is_in_ml"].any()